@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Set
 
 from .entities import Media
 
@@ -7,21 +8,41 @@ class Repository(ABC):
     """An abstract class representing a repository for media files.
 
     This class is used to define the interface for a repository that can save and delete media files.
-    Classes that implement this interface must implement the `save` and `delete` methods.
+    Classes that implement this interface must implement the `save`, `delete` and `find_existing` methods.
+    They can override `save_batch` when the underlying storage can save several media files at once.
     """
 
-    @classmethod
     @abstractmethod
-    def save(cls, media: Media) -> None:
+    def save(self, media: Media) -> None:
         """Saves a media file to the repository.
 
         Args:
             media: The media file to save.
         """
 
-    @classmethod
+    def save_batch(self, medias: List[Media]) -> None:
+        """Saves a batch of media files to the repository.
+        By default, each media file is saved one after the other with `save`.
+
+        Args:
+            medias: The media files to save.
+        """
+        for media in medias:
+            self.save(media)
+
+    @abstractmethod
+    def find_existing(self, titles: List[str]) -> Set[str]:
+        """Finds which of the given media titles already exist in the repository.
+
+        Args:
+            titles: The titles of the media files to look for.
+
+        Returns:
+            The titles that already exist in the repository.
+        """
+
     @abstractmethod
-    def delete(cls, media: Media) -> None:
+    def delete(self, media: Media) -> None:
         """Deletes a media file from the repository.
 
         Args:
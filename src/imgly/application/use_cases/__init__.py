@@ -1,4 +1,11 @@
 from .abstract_use_case import UseCase
 from .upload_media_use_case import UploadMediaUseCase
+from .upload_media_batch_use_case import UploadMediaBatchUseCase
+from .find_existing_media_use_case import FindExistingMediaUseCase
 
-__all__ = ["UseCase", "UploadMediaUseCase"]
+__all__ = [
+    "UseCase",
+    "UploadMediaUseCase",
+    "UploadMediaBatchUseCase",
+    "FindExistingMediaUseCase",
+]
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Tuple
+
+from .abstract_use_case import UseCase
+
+
+class FindExistingMediaUseCase(UseCase):
+
+    @dataclass(frozen=True)
+    class FindExistingMediaInputDTO(UseCase.InputDTO):
+        media_titles: Tuple[str, ...]
+
+    @dataclass(frozen=True)
+    class FindExistingMediaOutputDTO(UseCase.OutputDTO):
+        existing_titles: FrozenSet[str]
+
+    def execute(self, dto: FindExistingMediaInputDTO) -> FindExistingMediaOutputDTO:
+        existing = self.repository.find_existing(list(dto.media_titles))
+
+        return FindExistingMediaUseCase.FindExistingMediaOutputDTO(
+            existing_titles=frozenset(existing)
+        )
@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+from .abstract_use_case import UseCase
+from .upload_media_use_case import UploadMediaUseCase
+from ..entities import Media
+
+
+class UploadMediaBatchUseCase(UseCase):
+
+    @dataclass(frozen=True)
+    class UploadMediaBatchInputDTO(UseCase.InputDTO):
+        medias: Tuple[UploadMediaUseCase.UploadMediaInputDTO, ...]
+
+    def execute(self, dto: UploadMediaBatchInputDTO) -> None:
+        medias = [
+            Media(
+                title=media_dto.media_title,
+                data=media_dto.media_data,
+                description=media_dto.media_description,
+            )
+            for media_dto in dto.medias
+        ]
+
+        self.repository.save_batch(medias)
@@ -1,8 +1,12 @@
 from dataclasses import dataclass, asdict
-from typing import Optional
+from typing import List, Optional, Set
 
 from imgly.application import Repository
-from imgly.application.use_cases import UploadMediaUseCase
+from imgly.application.use_cases import (
+    UploadMediaUseCase,
+    UploadMediaBatchUseCase,
+    FindExistingMediaUseCase,
+)
 
 
 class ImglyController:
@@ -61,3 +65,55 @@ class ImglyController:
 
         # execute the use case
         use_case.execute(upload_use_case_dto)
+
+    def upload_media_batch(self, dtos: List[UploadMediaInputDTO]) -> None:
+        """
+        Uploads a batch of media to the repository using the `UploadMediaBatchUseCase`.
+        The controller DTOs are passed and will be used to create the use case DTO.
+
+        Args:
+            dtos: The controller DTOs containing the media titles and base64 encoded medias.
+
+        Raises:
+            UploadMediaError: If the media upload fails.
+            DuplicateMediaError: If one of the media already exists in the repository.
+        """
+        # initialize the use case with the provided repository
+        use_case = UploadMediaBatchUseCase(repository=self.repository)
+
+        # construct the use case DTO
+        upload_batch_use_case_dto: UploadMediaBatchUseCase.UploadMediaBatchInputDTO = (
+            UploadMediaBatchUseCase.UploadMediaBatchInputDTO(
+                medias=tuple(
+                    UploadMediaUseCase.UploadMediaInputDTO(**asdict(dto))
+                    for dto in dtos
+                )
+            )
+        )
+
+        # execute the use case
+        use_case.execute(upload_batch_use_case_dto)
+
+    def find_existing_media(self, media_titles: List[str]) -> Set[str]:
+        """
+        Finds which media already exist in the repository using the `FindExistingMediaUseCase`.
+
+        Args:
+            media_titles: The titles of the media to look for.
+
+        Returns:
+            The titles of the media that already exist in the repository.
+        """
+        # initialize the use case with the provided repository
+        use_case = FindExistingMediaUseCase(repository=self.repository)
+
+        # execute the use case with its DTO
+        output_dto: FindExistingMediaUseCase.FindExistingMediaOutputDTO = (
+            use_case.execute(
+                FindExistingMediaUseCase.FindExistingMediaInputDTO(
+                    media_titles=tuple(media_titles)
+                )
+            )
+        )
+
+        return set(output_dto.existing_titles)
@@ -1,3 +1,4 @@
+from .config import GitHubConfig, ConfigError, PATH_LAYOUTS
 from .github_repository import (
     GitHubRepository,
     UploadMediaError,
@@ -6,6 +7,9 @@ from .github_repository import (
 )
 
 __all__ = [
+    "GitHubConfig",
+    "ConfigError",
+    "PATH_LAYOUTS",
     "GitHubRepository",
     "UploadMediaError",
     "DuplicateMediaError",
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import tomllib
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# load the environment variables, to get the GitHub token
+load_dotenv()
+
+# environment variable pointing to the config file
+CONFIG_ENV_VAR = "IMGLY_CONFIG"
+
+# config files looked up, in order, when the environment variable is not set
+DEFAULT_CONFIG_PATHS: List[Path] = [
+    Path("imgly.toml"),
+    Path("~/.config/imgly/config.toml").expanduser(),
+]
+
+# presets of the templates used to generate the folder (shard) of a media file inside the media folder
+PATH_LAYOUTS: Dict[str, str] = {
+    "date": "{date}",
+    "date-nested": "{year}/{month}/{day}",
+    "hash-prefix": "{hash:.2}/{hash:.4}",
+}
+
+
+class ConfigError(Exception):
+    """Raised when the configuration of the GitHub repository is invalid."""
+
+
+@dataclass(frozen=True)
+class GitHubConfig:
+    """Configuration of the GitHub repository where the media files are saved.
+
+    The configuration is read from the `[github]` table of a TOML file, every key being optional:
+
+        [github]
+        owner = "ArnaudJalbert"
+        repo = "neighborly-celery"
+        branch = "main"
+        media_folder = "6-medias"
+        path_layout = "date-nested"
+        token_env = "GH_TOKEN"
+
+    Attributes:
+        owner: The owner of the GitHub repository.
+        repo: The name of the GitHub repository.
+        branch: The branch the media files are committed to.
+        media_folder: The folder of the repository containing the media files.
+        path_layout: The name of a preset of `PATH_LAYOUTS`, or a template of the folder of a media file inside the
+            media folder. The template can use `{date}`, `{year}`, `{month}`, `{day}` and `{hash}`, the sha256 of the
+            media title, e.g. `{hash:.2}` for its first two characters.
+        token_env: The environment variable containing the GitHub token.
+        token_file: Optional file containing the GitHub token, used instead of the environment variable.
+    """
+
+    owner: str = "ArnaudJalbert"
+    repo: str = "neighborly-celery"
+    branch: str = "main"
+    media_folder: str = "6-medias"
+    path_layout: str = "date"
+    token_env: str = "GH_TOKEN"
+    token_file: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        # a layout that is neither a preset nor a template is most likely a misspelled preset
+        if self.path_layout not in PATH_LAYOUTS and "{" not in self.path_layout:
+            raise ConfigError(
+                f"Unknown path layout `{self.path_layout}`, use one of {", ".join(PATH_LAYOUTS)} or a template."
+            )
+
+        # render the template once, so an invalid layout is reported when the config is loaded
+        try:
+            self.get_shard("media.png", datetime.today())
+        except (KeyError, ValueError, IndexError) as e:
+            raise ConfigError(f"Invalid path layout `{self.path_layout}`: {e}")
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "GitHubConfig":
+        """Loads the configuration from a TOML file.
+        If no path is given, the file pointed to by `IMGLY_CONFIG` is used, then the first existing file of
+        `DEFAULT_CONFIG_PATHS`. The default configuration is returned if there is no config file.
+
+        Args:
+            path: Optional path to the config file.
+
+        Returns:
+            The configuration of the GitHub repository.
+
+        Raises:
+            ConfigError: The config file does not exist or is invalid.
+        """
+        if path is None and os.environ.get(CONFIG_ENV_VAR):
+            path = Path(os.environ[CONFIG_ENV_VAR])
+
+        if path is None:
+            path = next((p for p in DEFAULT_CONFIG_PATHS if p.is_file()), None)
+            if path is None:
+                return cls()
+
+        if not path.is_file():
+            raise ConfigError(f"The config file `{path}` does not exist.")
+
+        try:
+            with open(path, "rb") as config_file:
+                content: Dict[str, Any] = tomllib.load(config_file)
+        except tomllib.TOMLDecodeError as e:
+            raise ConfigError(f"The config file `{path}` is not valid TOML: {e}")
+
+        values: Any = content.get("github", {})
+        if not isinstance(values, dict):
+            raise ConfigError(f"The `github` entry of `{path}` must be a table.")
+
+        known: List[str] = [f.name for f in fields(cls)]
+        unknown: List[str] = [key for key in values if key not in known]
+        if unknown:
+            raise ConfigError(
+                f"Unknown keys in the config file `{path}`: {", ".join(unknown)}."
+            )
+
+        invalid: List[str] = [
+            key for key, value in values.items() if not isinstance(value, str)
+        ]
+        if invalid:
+            raise ConfigError(
+                f"The keys of the config file `{path}` must be strings: {", ".join(invalid)}."
+            )
+
+        return cls(**values)
+
+    def get_token(self) -> Optional[str]:
+        """Gets the GitHub token from the token file if set, from the environment variable otherwise.
+
+        Returns:
+            The GitHub token, or None if it is not set.
+        """
+        if self.token_file:
+            return Path(self.token_file).expanduser().read_text().strip()
+
+        return os.environ.get(self.token_env)
+
+    def get_shard(self, title: str, date: datetime) -> str:
+        """Generates the folder of a media file inside the media folder, using the path layout.
+
+        Args:
+            title: The title of the media file.
+            date: The date at which the media file is saved.
+
+        Returns:
+            The folder of the media file, relative to the media folder.
+        """
+        template: str = PATH_LAYOUTS.get(self.path_layout, self.path_layout)
+
+        return template.format(
+            date=date.strftime("%Y-%m-%d"),
+            year=date.strftime("%Y"),
+            month=date.strftime("%m"),
+            day=date.strftime("%d"),
+            hash=hashlib.sha256(title.encode("utf-8")).hexdigest(),
+        ).strip("/")
@@ -1,21 +1,19 @@
 import json
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
-from dotenv import load_dotenv
-from requests import Response
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 
 from imgly.application.repository import Repository
 from imgly.application.entities import Media
+from .config import GitHubConfig
 
-
-# load the environment variables, to get the GitHub token
-load_dotenv()
-
-REPO_NAME = "neighborly-celery"
-MEDIA_FOLDER = "6-medias"
+# name of the file listing the media files of a shard, kept next to them
+INDEX_FILE = "index.json"
 
 
 class UploadMediaError(Exception):
@@ -23,7 +21,15 @@ class UploadMediaError(Exception):
 
 
 class DuplicateMediaError(Exception):
-    """Raised when a media file already exists in the repository."""
+    """Raised when a media file already exists in the repository.
+
+    Attributes:
+        titles: The titles of the media files that already exist in the repository.
+    """
+
+    def __init__(self, message: str, titles: Iterable[str] = ()) -> None:
+        super().__init__(message)
+        self.titles: Set[str] = set(titles)
 
 
 class DeleteMediaError(Exception):
@@ -34,22 +40,66 @@ class GitHubRepository(Repository):
     """A class representing a repository that saves and deletes media files in a GitHub repository.
 
     This class implements the `Repository` interface and uses the GitHub API to save and delete media files.
+    The media files are saved in shards, folders of the media folder generated by the path layout of the config. Each
+    shard has an index file listing its media files, updated in the same commit as the media files, so checking for
+    duplicates only reads the index of the shard instead of listing a folder.
 
     Attributes:
-        headers: A dictionary containing the headers to be sent in the request.
-        content_url: A string containing the URL to upload/delete media files to the repository.
+        config: The configuration of the GitHub repository.
+        api_url: A string containing the URL of the repository in the GitHub API.
+        session: The HTTP session shared by all the requests, keeping the connections to GitHub open between them.
+        max_workers: The maximum number of media files uploaded concurrently when saving a batch.
+        index_ttl: The number of seconds the index of a shard is cached before being fetched again. The cache is only
+            used to look for existing media files, the indexes written by a commit are read at its parent commit, or
+            reused without a request if the parent is the last commit of this repository.
+        max_commit_attempts: The number of times a commit is built again when the branch moves while it is created.
     """
 
-    # TODO (Arnaud) -> This should be provided at initialization and not hardcoded, maybe saved through a config file
-    headers: Dict[str, str] = {
-        "Authorization": f"token {os.environ['GH_TOKEN']}",
-    }
-    content_url: str = (
-        "https://api.github.com/repos/ArnaudJalbert/{repo_name}/contents/{upload_path}"
-    )
+    max_workers: int = 8
+    index_ttl: float = 60.0
+    max_commit_attempts: int = 3
 
-    @staticmethod
-    def _get_path(media: Media) -> str:
+    def __init__(self, config: Optional[GitHubConfig] = None) -> None:
+        """Initializes the GitHubRepository.
+        If no config is given, it is loaded with `GitHubConfig.load`.
+
+        Args:
+            config: Optional configuration of the GitHub repository.
+
+        Raises:
+            ConfigError: The config file is invalid.
+        """
+        self.config: GitHubConfig = config or GitHubConfig.load()
+        self.api_url: str = (
+            f"https://api.github.com/repos/{self.config.owner}/{self.config.repo}"
+        )
+
+        self.session: Session = requests.Session()
+        token: Optional[str] = self.config.get_token()
+        if token:
+            self.session.headers.update({"Authorization": f"token {token}"})
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=self.max_workers))
+
+        # cache of the media files of each shard, with the time at which the index was read
+        self._shard_index: Dict[str, Tuple[float, Set[str]]] = {}
+
+        # sha of the last commit of this repository, with the indexes known at that commit
+        self._head_sha: Optional[str] = None
+        self._head_indexes: Dict[str, Set[str]] = {}
+
+    def _get_shard(self, title: str) -> str:
+        """Generates the path of the shard of a media file, using the path layout of the config.
+
+        Args:
+            title: The title of the media file.
+
+        Returns:
+            The path of the shard in the repository.
+        """
+        shard: str = self.config.get_shard(title, datetime.today())
+        return f"{self.config.media_folder}/{shard}"
+
+    def _get_path(self, media: Media) -> str:
         """Generates the path where the media file will be uploaded.
 
         Args:
@@ -58,63 +108,351 @@ class GitHubRepository(Repository):
         Returns:
             The path where the media file will be uploaded.
         """
-        date: str = datetime.today().strftime("%Y-%m-%d")
-        return f"{MEDIA_FOLDER}/{date}/{media.title}"
+        return f"{self._get_shard(media.title)}/{media.title}"
 
-    @classmethod
-    def save(cls, media: Media) -> None:
-        """Saves a media file to the repository by uploading it to the GitHub repository.
+    def _git_request(
+        self,
+        method: str,
+        endpoint: str,
+        payload: Optional[Dict[str, Any]] = None,
+        error: type[Exception] = UploadMediaError,
+    ) -> Dict[str, Any]:
+        """Sends a request to the Git database API of the repository.
 
         Args:
-            media: The media file to save.
+            method: The HTTP method of the request.
+            endpoint: The endpoint of the Git database API, e.g. `blobs` or `refs/heads/main`.
+            payload: Optional data to be sent in the request.
+            error: The error raised if the request fails.
+
+        Returns:
+            The JSON response of the request.
 
         Raises:
-            UploadMediaError: An error occurred while uploading the media file.
-            DuplicateMediaError: The media file already exists in the repository.
+            UploadMediaError: The request failed, unless another error is given.
         """
-        # generate the path where the media file will be uploaded
-        upload_path: str = cls._get_path(media)
-
-        # generate the commit message if the media file has does not have a description
-        # if the media file has a description, use it as the commit message
-        commit_message: str = (
-            media.description
-            if media.description
-            else f"Add media file: {media.title} at {datetime.now()}"
+        response: Response = self.session.request(
+            method,
+            f"{self.api_url}/git/{endpoint}",
+            data=json.dumps(payload) if payload is not None else None,
         )
 
-        # generate the url where the media file will be uploaded
-        url: str = cls.content_url.format(repo_name=REPO_NAME, upload_path=upload_path)
+        if response.status_code >= 400:
+            raise error(f"Request to `{endpoint}` failed. \n\n {response.text}")
 
-        # check if the media file already exists in the repository
-        retrieve_image: Response = requests.get(url, headers=cls.headers)
+        return response.json()
+
+    def _read_index(
+        self,
+        shard: str,
+        ref: Optional[str] = None,
+        error: type[Exception] = UploadMediaError,
+    ) -> Set[str]:
+        """Reads the names of the media files of a shard from its index file.
+        Shards created before index files existed are listed once with the Git trees API, their index file is then
+        written by the next commit. Without a ref, the index of the branch is read and cached for `index_ttl` seconds.
+        With a ref, the TTL cache is skipped so the index matches that commit exactly, only the indexes known at the
+        last commit of this repository are reused.
+
+        Args:
+            shard: The path of the shard in the repository.
+            ref: Optional commit to read the index at, the branch by default.
+            error: The error raised if the index can't be read.
+
+        Returns:
+            The names of the media files of the shard, empty if the shard does not exist.
+
+        Raises:
+            UploadMediaError: The index can't be read or the shard listing is truncated, unless another error is given.
+                Errors are never cached, so the next call reads the index again.
+        """
+        if ref is None:
+            cached: Optional[Tuple[float, Set[str]]] = self._shard_index.get(shard)
+            if cached and time.monotonic() - cached[0] < self.index_ttl:
+                return cached[1]
+        elif ref == self._head_sha and shard in self._head_indexes:
+            return self._head_indexes[shard]
+
+        # read the raw content of the index file
+        response: Response = self.session.get(
+            f"{self.api_url}/contents/{shard}/{INDEX_FILE}",
+            params={"ref": ref or self.config.branch},
+            headers={"Accept": "application/vnd.github.raw+json"},
+        )
 
-        # if the media file already exists, raise an error
-        if retrieve_image.json().get("sha", False):
-            raise DuplicateMediaError(
-                f"Media file: {media.title} already exists in the repository."
+        names: Set[str]
+        if response.status_code == 404:
+            # list the shard if it has no index yet, the trees API is not truncated at 1,000 entries
+            tree_response: Response = self.session.get(
+                f"{self.api_url}/git/trees/{ref or self.config.branch}:{shard}"
             )
+            if tree_response.status_code == 404:
+                names = set()
+            elif tree_response.status_code >= 400:
+                raise error(
+                    f"Failed to list the shard `{shard}`. \n\n {tree_response.text}"
+                )
+            elif tree_response.json().get("truncated"):
+                raise error(
+                    f"The listing of the shard `{shard}` is truncated, its media files can't be checked."
+                )
+            else:
+                names = {
+                    entry["path"]
+                    for entry in tree_response.json()["tree"]
+                    if entry["type"] == "blob" and entry["path"] != INDEX_FILE
+                }
+        elif response.status_code >= 400:
+            raise error(
+                f"Failed to read the index of the shard `{shard}`. \n\n {response.text}"
+            )
+        else:
+            names = set(json.loads(response.content))
+
+        self._shard_index[shard] = (time.monotonic(), names)
+        return names
+
+    @staticmethod
+    def _get_index_entry(shard: str, names: Set[str]) -> Dict[str, Any]:
+        """Generates the tree entry writing the index file of a shard.
+
+        Args:
+            shard: The path of the shard in the repository.
+            names: The names of the media files of the shard.
 
-        # create the data to be sent in the request
-        data: Dict[str, str] = {
-            "message": commit_message,
-            "content": media.data,
-            "branch": "main",
+        Returns:
+            The tree entry of the index file.
+        """
+        return {
+            "path": f"{shard}/{INDEX_FILE}",
+            "mode": "100644",
+            "type": "blob",
+            "content": json.dumps(sorted(names), indent=0) + "\n",
         }
 
-        save_media_response: Response = requests.put(
-            url, headers=cls.headers, data=json.dumps(data)
+    def _commit(
+        self,
+        build_entries: Callable[[str], List[Dict[str, Any]]],
+        message: str,
+        indexes: Optional[Dict[str, Set[str]]] = None,
+        error: type[Exception] = UploadMediaError,
+    ) -> None:
+        """Commits tree entries on top of the branch and moves the branch to the new commit.
+        The entries are built from the parent commit, so the indexes they write are read at that commit. The branch is
+        only moved if it still points to the parent, if another process committed in the meantime the entries are built
+        again on top of its commit, up to `max_commit_attempts` times.
+        Once committed, the indexes written are kept with the sha of the commit, so the next commit built on top of it
+        doesn't read them again.
+
+        Args:
+            build_entries: Builds the entries of the tree to commit, as expected by the Git trees API, from the sha of
+                the parent commit.
+            message: The commit message.
+            indexes: Optional names of the media files of each shard whose index is written, filled by `build_entries`.
+            error: The error raised if one of the requests fails.
+
+        Raises:
+            UploadMediaError: The commit failed, unless another error is given.
+        """
+        branch: str = self.config.branch
+
+        for _ in range(self.max_commit_attempts):
+            # get the commit the branch currently points to
+            head_sha: str = self._git_request(
+                "GET", f"ref/heads/{branch}", error=error
+            )["object"]["sha"]
+            base_tree_sha: str = self._git_request(
+                "GET", f"commits/{head_sha}", error=error
+            )["tree"]["sha"]
+
+            # create a tree containing the entries on top of the current one
+            tree: Dict[str, Any] = self._git_request(
+                "POST",
+                "trees",
+                {"base_tree": base_tree_sha, "tree": build_entries(head_sha)},
+                error=error,
+            )
+
+            # commit the tree and move the branch to the new commit, if nobody committed in the meantime
+            commit: Dict[str, Any] = self._git_request(
+                "POST",
+                "commits",
+                {"message": message, "tree": tree["sha"], "parents": [head_sha]},
+                error=error,
+            )
+            response: Response = self.session.request(
+                "PATCH",
+                f"{self.api_url}/git/refs/heads/{branch}",
+                data=json.dumps({"sha": commit["sha"], "force": False}),
+            )
+
+            # the update is not a fast forward, the branch moved since it was read
+            if response.status_code == 422:
+                continue
+
+            if response.status_code >= 400:
+                raise error(
+                    f"Request to `refs/heads/{branch}` failed. \n\n {response.text}"
+                )
+
+            # the indexes of the parent are still valid if it is the last commit of this repository
+            if head_sha != self._head_sha:
+                self._head_indexes = {}
+            self._head_sha = commit["sha"]
+            for shard, names in (indexes or {}).items():
+                self._head_indexes[shard] = names
+                self._shard_index[shard] = (time.monotonic(), names)
+            return
+
+        raise error(
+            f"The branch `{branch}` kept moving, the commit failed after {self.max_commit_attempts} attempts."
+        )
+
+    def _create_blob(self, media: Media) -> str:
+        """Uploads the content of a media file as a blob in the repository.
+
+        Args:
+            media: The media file to upload.
+
+        Returns:
+            The sha of the created blob.
+        """
+        blob: Dict[str, Any] = self._git_request(
+            "POST", "blobs", {"content": media.data, "encoding": "base64"}
         )
+        return blob["sha"]
+
+    @staticmethod
+    def _get_batch_commit_message(medias: List[Media]) -> str:
+        """Generates the commit message of a batch of media files.
+        The descriptions of the media files are aggregated in the body of the commit message.
+        A single media file keeps its description as commit message, if it has one.
+
+        Args:
+            medias: The media files of the batch.
 
-        if save_media_response.status_code >= 400:
-            raise UploadMediaError(
-                f"Failed to upload media file: {media.title} \n\n {save_media_response.text}"
+        Returns:
+            The commit message.
+        """
+        if len(medias) == 1:
+            return (
+                medias[0].description
+                if medias[0].description
+                else f"Add media file: {medias[0].title} at {datetime.now()}"
             )
 
-    @classmethod
-    def delete(cls, media: Media) -> None:
+        header: str = f"Add {len(medias)} media files at {datetime.now()}"
+        descriptions: List[str] = [
+            f"- {media.title}: {media.description}"
+            for media in medias
+            if media.description
+        ]
+
+        if not descriptions:
+            return header
+
+        return "\n\n".join([header, "\n".join(descriptions)])
+
+    def save(self, media: Media) -> None:
+        """Saves a media file to the repository by uploading it to the GitHub repository.
+        The media file is committed with the updated index of its shard.
+
+        Args:
+            media: The media file to save.
+
+        Raises:
+            UploadMediaError: An error occurred while uploading the media file.
+            DuplicateMediaError: The media file already exists in the repository.
+        """
+        self.save_batch([media])
+
+    def save_batch(self, medias: List[Media]) -> None:
+        """Saves a batch of media files to the repository in a single commit.
+        The indexes of the shards are read at the parent commit to check for duplicates, then the blobs of the media
+        files are uploaded concurrently and committed with the updated indexes.
+
+        Args:
+            medias: The media files to save.
+
+        Raises:
+            UploadMediaError: An error occurred while uploading the media files, or one of their titles is not a valid
+                file name.
+            DuplicateMediaError: One of the media files already exists in the repository.
+        """
+        if not medias:
+            return
+
+        # the title is the name of the file in its shard, it can't be a path or replace the index of the shard
+        for media in medias:
+            if media.title == INDEX_FILE:
+                raise UploadMediaError(
+                    f"Media file: {media.title} is reserved for the index of the shards."
+                )
+            if "/" in media.title or "\\" in media.title or ".." in media.title:
+                raise UploadMediaError(
+                    f"Media file: {media.title} can't contain path separators or `..`."
+                )
+
+        # generate the paths where the media files will be uploaded, grouped by shard
+        upload_paths: List[str] = [self._get_path(media) for media in medias]
+        shards: Dict[str, Set[str]] = {}
+        for path in upload_paths:
+            shard, name = path.rsplit("/", 1)
+            shards.setdefault(shard, set()).add(name)
+
+        indexes: Dict[str, Set[str]] = {}
+        blob_shas: List[str] = []
+
+        def build_entries(head_sha: str) -> List[Dict[str, Any]]:
+            # check if one of the media files already exists at the parent commit, reading each index only once
+            for shard, names in shards.items():
+                index: Set[str] = self._read_index(shard, head_sha)
+                duplicates: Set[str] = names & index
+                if duplicates:
+                    raise DuplicateMediaError(
+                        f"Media files: {", ".join(sorted(duplicates))} already exist in the repository.",
+                        duplicates,
+                    )
+                indexes[shard] = index | names
+
+            # upload the media files concurrently, only once if the commit is built again
+            if not blob_shas:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    blob_shas.extend(executor.map(self._create_blob, medias))
+
+            # the media files with the updated indexes
+            return [
+                {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                for path, sha in zip(upload_paths, blob_shas)
+            ] + [self._get_index_entry(shard, names) for shard, names in indexes.items()]
+
+        self._commit(build_entries, self._get_batch_commit_message(medias), indexes)
+
+    def find_existing(self, titles: List[str]) -> Set[str]:
+        """Finds which of the given media titles already exist in the repository, reading each shard index once.
+
+        Args:
+            titles: The titles of the media files to look for.
+
+        Returns:
+            The titles that already exist in the repository.
+
+        Raises:
+            UploadMediaError: The index of a shard can't be read.
+        """
+        shards: Dict[str, Set[str]] = {}
+        for title in titles:
+            shards.setdefault(self._get_shard(title), set()).add(title)
+
+        return {
+            title
+            for shard, names in shards.items()
+            for title in names & self._read_index(shard)
+        }
+
+    def delete(self, media: Media) -> None:
         """Deletes a media file from the GitHub repository.
-        Checks if the media file exists in the repository, then deletes it.
+        Checks if the media file exists in the repository, then deletes it and removes it from the index of its shard.
 
         Args:
             media: The media file to delete.
@@ -123,7 +461,8 @@ class GitHubRepository(Repository):
             DeleteMediaError: An error occurred while deleting the media file.
         """
         # generate the path where the media file will be deleted
-        delete_path: str = cls._get_path(media)
+        delete_path: str = self._get_path(media)
+        shard: str = delete_path.rsplit("/", 1)[0]
 
         # generate the commit message if the media file has does not have a description
         # if the media file has a description, use it as the commit message
@@ -133,30 +472,33 @@ class GitHubRepository(Repository):
             else f"Delete media file: {media.title} at {datetime.now()}"
         )
 
-        # generate the url where the media file will be deleted
-        url = cls.content_url.format(repo_name=REPO_NAME, upload_path=delete_path)
-
-        # get the sha of the media file
-        media_sha: str = requests.get(url, headers=cls.headers).json().get("sha")
+        # check if the media file exists in the repository
+        media_response: Response = self.session.get(
+            f"{self.api_url}/contents/{delete_path}",
+            params={"ref": self.config.branch},
+        )
 
         # if the media file does not exist, raise an error
-        if not media_sha:
+        if media_response.status_code == 404:
             raise DeleteMediaError(
                 f"Media file: {media.title} does not exist in the repository, it can't be deleted."
             )
 
-        # create the data to be sent in the request
-        data: Dict[str, str] = {
-            "message": commit_message,
-            "branch": "main",
-            "sha": media_sha,
-        }
-
-        delete_media_response: Response = requests.delete(
-            url, headers=cls.headers, data=json.dumps(data)
-        )
-
-        if delete_media_response.status_code >= 400:
+        if media_response.status_code >= 400:
             raise DeleteMediaError(
-                f"Failed to delete media file: {media.title} \n\n {delete_media_response.text}"
+                f"Failed to check if the media file: {media.title} exists. \n\n {media_response.text}"
             )
+
+        indexes: Dict[str, Set[str]] = {}
+
+        def build_entries(head_sha: str) -> List[Dict[str, Any]]:
+            # remove the media file from the index read at the parent commit
+            indexes[shard] = self._read_index(shard, head_sha, DeleteMediaError) - {
+                media.title
+            }
+            return [
+                {"path": delete_path, "mode": "100644", "type": "blob", "sha": None},
+                self._get_index_entry(shard, indexes[shard]),
+            ]
+
+        self._commit(build_entries, commit_message, indexes, DeleteMediaError)
@@ -1,6 +1,7 @@
 import base64
+from itertools import batched
 from pathlib import Path
-from typing import Optional, Set
+from typing import List, Optional, Set
 
 import typer
 
@@ -9,10 +10,52 @@ from rich import print
 from imgly.constants import SUPPORTED_IMAGES_EXTENSIONS
 from imgly import ImglyController
 from imgly.infra.github_infrastructure import *
+from interfaces.server import MediaBatcher, create_server
+from .manifest import (
+    SUPPORTED_MANIFEST_EXTENSIONS,
+    ManifestRow,
+    ManifestScan,
+    read_manifest,
+    scan_manifest,
+)
 
 app: typer.Typer = typer.Typer()
-github_repository: GitHubRepository = GitHubRepository()
-controller: ImglyController = ImglyController(repository=github_repository)
+
+# built by `setup` before a command runs, so a bad configuration doesn't break `--help`
+controller: Optional[ImglyController] = None
+
+
+@app.callback()
+def setup(
+    config: Optional[str] = typer.Option(
+        default=None,
+        help="Path to the config file of the repository, `IMGLY_CONFIG` or `imgly.toml` by default.",
+    )
+) -> None:
+    """
+    CLI tool to manipulate and manage medias.
+
+    Args:
+        config: Optional path to the config file of the repository.
+
+    Raises:
+        typer.Abort: If the configuration can't be loaded, abort the command.
+    """
+    global controller
+
+    # the controller is already built, e.g. when it is replaced by the tests
+    if controller is not None:
+        return
+
+    try:
+        github_repository: GitHubRepository = GitHubRepository(
+            GitHubConfig.load(Path(config) if config else None)
+        )
+    except (ConfigError, OSError) as e:
+        print(f"[bold red]Error:[/bold red] Failed to load the configuration. {e}")
+        raise typer.Abort()
+
+    controller = ImglyController(repository=github_repository)
 
 
 @app.command()
@@ -133,6 +176,228 @@ def upload_directory(directory_path: str) -> None:
     )
 
 
+@app.command()
+def ingest(
+    manifest_path: str,
+    batch_size: int = typer.Option(
+        default=100, min=1, help="Number of files uploaded in each commit."
+    ),
+    skip_invalid: bool = typer.Option(
+        default=False, help="Skip the invalid rows instead of aborting."
+    ),
+    skip_existing: bool = typer.Option(
+        default=False,
+        help="Skip the files that already exist in the repository, e.g. to resume an ingest.",
+    ),
+) -> None:
+    """
+    Uploads the files listed in a JSONL or CSV manifest to the set Repository.
+    Each row has a `path` and optionally a `title` and a `description`, relative paths are resolved from the manifest
+    directory. The whole manifest is validated and deduped before anything is uploaded, then the files are uploaded
+    in batches, one commit per batch. The titles of each batch are checked against the repository before its files
+    are read, the files that already exist abort the command unless `--skip-existing` is set, so a partly ingested
+    manifest can be resumed.
+
+    Args:
+        manifest_path: The path to the manifest.
+        batch_size: The number of files uploaded in each commit.
+        skip_invalid: Whether to skip the invalid rows instead of aborting.
+        skip_existing: Whether to skip the files that already exist in the repository instead of aborting.
+
+    Raises:
+        typer.Abort: If the manifest is invalid or if an upload fails, abort the command.
+    """
+    manifest: Path = Path(manifest_path)
+
+    # check if the manifest exists
+    if not manifest.is_file():
+        print(f"[bold red]Error:[/bold red] The manifest `{manifest.name}` does not exist.")
+        raise typer.Abort()
+
+    # check if the manifest is a supported format
+    if manifest.suffix not in SUPPORTED_MANIFEST_EXTENSIONS:
+        print(
+            f"[bold red]Error:[/bold red] The manifest `{manifest.name}` is not a supported format "
+            f"({", ".join(SUPPORTED_MANIFEST_EXTENSIONS)})."
+        )
+        raise typer.Abort()
+
+    # validate and dedupe the whole manifest before uploading anything
+    scan: ManifestScan = scan_manifest(manifest)
+
+    if scan.invalid_count:
+        level: str = (
+            "[bold yellow]Warning:[/bold yellow]"
+            if skip_invalid
+            else "[bold red]Error:[/bold red]"
+        )
+        print(
+            f"{level} {scan.invalid_count} rows of the manifest `{manifest.name}` are invalid: "
+            f"\n {"\n".join(scan.errors)}"
+        )
+        if not skip_invalid:
+            raise typer.Abort()
+
+    if scan.duplicate_count:
+        print(
+            f"[bold yellow]Warning:[/bold yellow] {scan.duplicate_count} rows of the manifest `{manifest.name}` "
+            f"have a title that is already listed, they will be skipped."
+        )
+
+    if not scan.valid_count:
+        print(
+            f"[bold red]Error:[/bold red] The manifest `{manifest.name}` has no file to upload."
+        )
+        raise typer.Abort()
+
+    print(
+        f"Uploading {scan.valid_count} files from [blue italic]{manifest.name}[/blue italic] to GitHub"
+    )
+
+    # stream the valid rows and upload them batch by batch
+    uploaded: int = 0
+    skipped: int = 0
+    for rows in batched(read_manifest(manifest, scan.skipped_lines), batch_size):
+        batch: List[ManifestRow] = list(rows)
+
+        # check the batch against the repository before reading its files
+        try:
+            existing: Set[str] = controller.find_existing_media(
+                [row.title for row in batch]
+            )
+        except Exception as e:
+            print(
+                f"[bold red]Error:[/bold red] Failed to check the batch starting at line {batch[0].line_number} "
+                f"against the repository, {uploaded} files were uploaded. {e}"
+            )
+            raise typer.Abort()
+
+        if existing and not skip_existing:
+            print(
+                f"[bold red]Error:[/bold red] The batch starting at line {batch[0].line_number} has files that "
+                f"already exist in the repository ({", ".join(sorted(existing))}), {uploaded} files were "
+                f"uploaded. Use `--skip-existing` to skip them."
+            )
+            raise typer.Abort()
+
+        skipped += len(existing)
+        batch = [row for row in batch if row.title not in existing]
+        if not batch:
+            continue
+
+        dtos: List[ImglyController.UploadMediaInputDTO] = []
+
+        # read the files of the batch, a file can become unreadable after the manifest was scanned
+        for row in batch:
+            try:
+                content: str = base64.b64encode(row.path.read_bytes()).decode("utf-8")
+            except OSError as e:
+                print(
+                    f"[bold red]Error:[/bold red] Line {row.line_number}: failed to read `{row.path}`, "
+                    f"{uploaded} files were uploaded. {e}"
+                )
+                raise typer.Abort()
+            dtos.append(
+                controller.UploadMediaInputDTO(
+                    media_title=row.title,
+                    media_data=content,
+                    media_description=row.description,
+                )
+            )
+
+        try:
+            controller.upload_media_batch(dtos)
+        except UploadMediaError as e:
+            print(
+                f"[bold red]Error:[/bold red] Failed to upload the batch starting at line "
+                f"{batch[0].line_number} to GitHub, {uploaded} files were uploaded. {e}"
+            )
+            raise typer.Abort()
+        except DuplicateMediaError as e:
+            print(
+                f"[bold red]Error:[/bold red] The batch starting at line {batch[0].line_number} has files that "
+                f"already exist in the repository, {uploaded} files were uploaded. Use `--skip-existing` to skip "
+                f"them. {e}"
+            )
+            raise typer.Abort()
+        except Exception as e:
+            print(
+                f"[bold red]Error:[/bold red] An error occurred, {uploaded} files were uploaded. {e}"
+            )
+            raise typer.Abort()
+
+        uploaded += len(batch)
+        print(f"Uploaded {uploaded + skipped}/{scan.valid_count} files to GitHub")
+
+    if skipped:
+        print(
+            f"[bold yellow]Warning:[/bold yellow] {skipped} files already existed in the repository and were skipped."
+        )
+
+    print(
+        f"[green bold]Manifest {manifest.name} was successfully uploaded to GitHub.[/green bold]"
+    )
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(
+        default="127.0.0.1", help="Host to listen on, must be a loopback address."
+    ),
+    port: int = typer.Option(default=8765, help="Port to listen on."),
+    socket_path: Optional[str] = typer.Option(
+        default=None, help="Listen on this Unix socket instead of a TCP port."
+    ),
+    max_batch_size: int = typer.Option(
+        default=50, min=1, help="Maximum number of files uploaded in each commit."
+    ),
+    max_delay: float = typer.Option(
+        default=2.0,
+        min=0.0,
+        help="Maximum number of seconds a file waits for others before its commit.",
+    ),
+) -> None:
+    """
+    Runs a local server uploading the files it receives to the set Repository.
+    Files are sent one at a time with `POST /media`, and the ones received close together are uploaded in a single
+    commit. The server keeps its connections to GitHub open, so each upload doesn't pay the startup cost of the CLI.
+
+    Args:
+        host: The host to listen on.
+        port: The port to listen on.
+        socket_path: Optional Unix socket to listen on instead of a TCP port.
+        max_batch_size: The maximum number of files uploaded in each commit.
+        max_delay: The maximum number of seconds a file waits for others before its commit.
+    """
+    batcher = MediaBatcher(
+        controller=controller, max_batch_size=max_batch_size, max_delay=max_delay
+    )
+    try:
+        server = create_server(
+            batcher, host=host, port=port, socket_path=socket_path
+        )
+    except (ValueError, OSError) as e:
+        print(f"[bold red]Error:[/bold red] Failed to start the server. {e}")
+        raise typer.Abort()
+
+    batcher.start()
+    print(
+        f"Serving imgly on [blue italic]{socket_path or f"http://{host}:{port}"}[/blue italic], "
+        f"press Ctrl+C to stop"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # stop receiving files, then upload the ones still pending
+        server.server_close()
+        batcher.stop()
+
+    print("[green bold]Server stopped.[/green bold]")
+
+
 def main() -> None:
     app()
 
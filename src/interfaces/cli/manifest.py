@@ -0,0 +1,181 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from imgly.constants import SUPPORTED_IMAGES_EXTENSIONS
+from interfaces.media_validation import validate_media
+
+SUPPORTED_MANIFEST_EXTENSIONS = [".jsonl", ".csv"]
+
+# maximum number of error messages kept when scanning a manifest, the others are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+class ManifestError(Exception):
+    """Raised when a row of a manifest is malformed."""
+
+
+@dataclass(frozen=True)
+class ManifestRow:
+    """A media file listed in a manifest.
+
+    Attributes:
+        line_number: The line of the row in the manifest.
+        path: The path to the media file, relative paths are resolved from the manifest directory.
+        title: The title of the media file, defaults to the name of the file.
+        description: Optional description of the media file.
+    """
+
+    line_number: int
+    path: Path
+    title: str
+    description: Optional[str] = None
+
+
+@dataclass
+class ManifestScan:
+    """The result of the validation of a manifest.
+
+    Attributes:
+        valid_count: The number of rows that can be uploaded.
+        duplicate_count: The number of rows skipped because their title was already listed.
+        invalid_count: The number of rows that are malformed or point to unsupported files.
+        errors: The messages of the first invalid rows.
+        skipped_lines: The line numbers of the duplicate and invalid rows.
+    """
+
+    valid_count: int = 0
+    duplicate_count: int = 0
+    invalid_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    skipped_lines: Set[int] = field(default_factory=set)
+
+
+def _iter_records(manifest: Path) -> Iterator[Tuple[int, Any]]:
+    """Streams the records of a manifest with their line number.
+    Lines of a JSONL manifest that can't be decoded are yielded as `None`.
+
+    Args:
+        manifest: The path to the manifest, a JSONL or CSV file.
+
+    Yields:
+        The line number and the record of each row of the manifest.
+    """
+    with open(manifest, newline="", encoding="utf-8") as manifest_file:
+        if manifest.suffix == ".csv":
+            reader = csv.DictReader(manifest_file)
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(manifest_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+
+
+def _to_row(line_number: int, record: Any, directory: Path) -> ManifestRow:
+    """Maps a record of a manifest to a row.
+
+    Args:
+        line_number: The line of the record in the manifest.
+        record: The decoded record.
+        directory: The directory of the manifest, used to resolve relative paths.
+
+    Returns:
+        The row of the manifest.
+
+    Raises:
+        ManifestError: The record is malformed.
+    """
+    if not isinstance(record, dict):
+        raise ManifestError(f"Line {line_number}: the row is not a valid object.")
+
+    fields: Dict[str, Any] = record
+    if not fields.get("path"):
+        raise ManifestError(f"Line {line_number}: the row has no `path`.")
+
+    path: Path = directory / str(fields["path"])
+
+    return ManifestRow(
+        line_number=line_number,
+        path=path,
+        title=str(fields.get("title") or path.name),
+        # the description is kept as is, `scan_manifest` rejects the ones that are not strings
+        description=fields.get("description") or None,
+    )
+
+
+def scan_manifest(manifest: Path) -> ManifestScan:
+    """Validates and dedupes all the rows of a manifest before uploading anything.
+    Only the titles and the skipped line numbers are kept in memory, the rows themselves are streamed.
+
+    Args:
+        manifest: The path to the manifest.
+
+    Returns:
+        The result of the validation.
+    """
+    scan = ManifestScan()
+    titles: Set[str] = set()
+
+    def reject(line_number: int, message: str) -> None:
+        scan.invalid_count += 1
+        scan.skipped_lines.add(line_number)
+        if len(scan.errors) < MAX_REPORTED_ERRORS:
+            scan.errors.append(message)
+
+    for line_number, record in _iter_records(manifest):
+        try:
+            row: ManifestRow = _to_row(line_number, record, manifest.parent)
+        except ManifestError as e:
+            reject(line_number, str(e))
+            continue
+
+        try:
+            validate_media(row.title, row.description)
+        except ValueError as e:
+            reject(line_number, f"Line {line_number}: {e}")
+            continue
+
+        if row.path.suffix not in SUPPORTED_IMAGES_EXTENSIONS:
+            reject(
+                line_number,
+                f"Line {line_number}: `{row.path}` is not a supported image type.",
+            )
+            continue
+
+        if not row.path.is_file():
+            reject(line_number, f"Line {line_number}: `{row.path}` does not exist.")
+            continue
+
+        if row.title in titles:
+            scan.duplicate_count += 1
+            scan.skipped_lines.add(line_number)
+            continue
+
+        titles.add(row.title)
+        scan.valid_count += 1
+
+    return scan
+
+
+def read_manifest(manifest: Path, skipped_lines: Set[int]) -> Iterator[ManifestRow]:
+    """Streams the rows of a manifest, leaving out the given lines.
+
+    Args:
+        manifest: The path to the manifest.
+        skipped_lines: The line numbers to leave out, usually the ones found by `scan_manifest`.
+
+    Yields:
+        The rows of the manifest.
+    """
+    for line_number, record in _iter_records(manifest):
+        if line_number in skipped_lines:
+            continue
+        yield _to_row(line_number, record, manifest.parent)
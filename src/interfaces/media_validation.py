@@ -0,0 +1,25 @@
+from pathlib import Path
+from typing import Any
+
+from imgly.constants import SUPPORTED_IMAGES_EXTENSIONS
+
+
+def validate_media(title: Any, description: Any = None) -> None:
+    """Validates the title and the description of a media received by an interface, before it is uploaded.
+    The title becomes the name of the file in the repository, so it can't be a path and must be a supported image.
+
+    Args:
+        title: The title of the media.
+        description: The optional description of the media.
+
+    Raises:
+        ValueError: The title or the description is not valid.
+    """
+    if not isinstance(title, str) or not title:
+        raise ValueError("The `title` of the media is required.")
+    if "/" in title or "\\" in title or ".." in title:
+        raise ValueError(f"The title `{title}` can't contain path separators or `..`.")
+    if Path(title).suffix not in SUPPORTED_IMAGES_EXTENSIONS:
+        raise ValueError(f"The media `{title}` is not a supported image type.")
+    if description is not None and not isinstance(description, str):
+        raise ValueError("The `description` of the media must be a string.")
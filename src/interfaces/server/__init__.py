@@ -0,0 +1,4 @@
+from .batcher import MediaBatcher
+from .imgly_server import create_server
+
+__all__ = ["MediaBatcher", "create_server"]
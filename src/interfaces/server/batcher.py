@@ -0,0 +1,193 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Set, Tuple
+
+from imgly import ImglyController
+from imgly.infra.github_infrastructure import DuplicateMediaError
+
+# a pending upload, the future is resolved once the media is committed
+PendingUpload = Tuple[ImglyController.UploadMediaInputDTO, Future]
+
+
+class MediaBatcher:
+    """
+    Coalesces the media uploaded one at a time into batches, each batch being uploaded with a single commit.
+    A batch is uploaded as soon as it reaches `max_batch_size` media, or `max_delay` seconds after its first media was
+    submitted, whichever comes first.
+
+    Attributes:
+        controller: The controller used to upload the batches.
+        max_batch_size: The maximum number of media in a batch.
+        max_delay: The maximum number of seconds a media waits for other media before its batch is uploaded.
+    """
+
+    def __init__(
+        self,
+        controller: ImglyController,
+        max_batch_size: int = 50,
+        max_delay: float = 2.0,
+    ) -> None:
+        """
+        Initializes the MediaBatcher, `start` needs to be called before submitting media.
+
+        Args:
+            controller: The controller used to upload the batches.
+            max_batch_size: The maximum number of media in a batch.
+            max_delay: The maximum number of seconds a media waits for other media before its batch is uploaded.
+        """
+        self.controller: ImglyController = controller
+        self.max_batch_size: int = max_batch_size
+        self.max_delay: float = max_delay
+        self._queue: queue.Queue[Optional[PendingUpload]] = queue.Queue()
+        self._worker: threading.Thread = threading.Thread(
+            target=self._run, name="imgly-batcher", daemon=True
+        )
+
+    def start(self) -> None:
+        """Starts uploading the submitted media in the background."""
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Uploads the media that are still pending, then stops the background worker."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def submit(self, dto: ImglyController.UploadMediaInputDTO) -> Future:
+        """
+        Submits a media to be uploaded with the next batch.
+
+        Args:
+            dto: The controller DTO containing the media title and base64 encoded media.
+
+        Returns:
+            A future resolved once the media is uploaded, or failed with the error raised by the upload.
+        """
+        future: Future = Future()
+        self._queue.put((dto, future))
+        return future
+
+    def _run(self) -> None:
+        """Collects the submitted media into batches and uploads them until the batcher is stopped."""
+        carry: List[PendingUpload] = []
+        stopping: bool = False
+
+        while not stopping or carry:
+            batch: List[PendingUpload] = carry
+            carry = []
+
+            # wait for the first media of the batch, unless media were carried from the previous batch
+            if not batch:
+                first: Optional[PendingUpload] = self._queue.get()
+                if first is None:
+                    break
+                batch.append(first)
+
+            # gather media until the batch is full or its first media waited long enough
+            deadline: float = time.monotonic() + self.max_delay
+            while not stopping and len(batch) < self.max_batch_size:
+                remaining: float = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending: Optional[PendingUpload] = self._queue.get(
+                        timeout=remaining
+                    )
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+
+            batch, carry = self._split_duplicates(batch)
+            self._upload(batch)
+
+    @staticmethod
+    def _split_duplicates(
+        batch: List[PendingUpload],
+    ) -> Tuple[List[PendingUpload], List[PendingUpload]]:
+        """
+        Splits the media that have the same title as a previous media of the batch, a commit can't add the same file
+        twice. The duplicates are carried to the next batch, where the repository reports them as duplicates.
+
+        Args:
+            batch: The pending uploads of the batch.
+
+        Returns:
+            The pending uploads with unique titles, and the ones carried to the next batch.
+        """
+        titles: Set[str] = set()
+        unique: List[PendingUpload] = []
+        duplicates: List[PendingUpload] = []
+
+        for pending in batch:
+            if pending[0].media_title in titles:
+                duplicates.append(pending)
+            else:
+                titles.add(pending[0].media_title)
+                unique.append(pending)
+
+        return unique, duplicates
+
+    def _upload(self, batch: List[PendingUpload]) -> None:
+        """
+        Uploads a batch and resolves the futures of its media.
+        If some media of the batch already exist in the repository, only their uploads fail and the rest of the batch
+        is uploaded again as a single batch.
+
+        Args:
+            batch: The pending uploads of the batch.
+        """
+        try:
+            self.controller.upload_media_batch([dto for dto, _ in batch])
+        except DuplicateMediaError as e:
+            duplicates: List[PendingUpload] = [
+                pending for pending in batch if pending[0].media_title in e.titles
+            ]
+
+            # the repository did not report which media exist, upload them one by one to find out
+            if not duplicates and len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            if not duplicates:
+                self._upload_one_by_one(batch)
+                return
+
+            for dto, future in duplicates:
+                future.set_exception(
+                    DuplicateMediaError(
+                        f"Media file: {dto.media_title} already exists in the repository.",
+                        [dto.media_title],
+                    )
+                )
+
+            remaining: List[PendingUpload] = [
+                pending for pending in batch if pending[0].media_title not in e.titles
+            ]
+            if remaining:
+                self._upload(remaining)
+            return
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for _, future in batch:
+            future.set_result(None)
+
+    def _upload_one_by_one(self, batch: List[PendingUpload]) -> None:
+        """
+        Uploads the media of a batch one by one, so each failure only fails its own upload.
+
+        Args:
+            batch: The pending uploads of the batch.
+        """
+        for dto, future in batch:
+            try:
+                self.controller.upload_media(dto)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
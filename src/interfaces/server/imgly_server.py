@@ -0,0 +1,233 @@
+import base64
+import binascii
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import stat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from imgly import ImglyController
+from imgly.infra.github_infrastructure import DuplicateMediaError, UploadMediaError
+from interfaces.media_validation import validate_media
+from .batcher import MediaBatcher
+
+
+class ImglyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of the imgly server.
+
+    Endpoints:
+        GET /health: Returns 200 when the server is up.
+        POST /media: Uploads a media, the body is a JSON object with `title`, the base64 encoded `data` and an optional
+            `description`. The response is sent once the batch containing the media is committed.
+    """
+
+    server: "ImglyHTTPServer | ImglyUnixServer"
+
+    def address_string(self) -> str:
+        # clients connected through a Unix socket have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        """Sends a JSON response.
+
+        Args:
+            status: The HTTP status of the response.
+            body: The body of the response.
+        """
+        content: bytes = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_upload_dto(self) -> ImglyController.UploadMediaInputDTO:
+        """Reads the media to upload from the body of the request.
+
+        Returns:
+            The controller DTO of the media.
+
+        Raises:
+            ValueError: The body of the request is not a valid media.
+        """
+        length: int = int(self.headers.get("Content-Length", 0))
+        try:
+            body: Any = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            raise ValueError("The body of the request is not valid JSON.")
+
+        if not isinstance(body, dict):
+            raise ValueError("The body of the request must be a JSON object.")
+
+        title: Any = body.get("title")
+        data: Any = body.get("data")
+        description: Any = body.get("description")
+
+        validate_media(title, description)
+        if not isinstance(data, str) or not data:
+            raise ValueError("The base64 encoded `data` of the media is required.")
+
+        # reject a malformed payload now, it would otherwise fail the whole batch it is uploaded with
+        try:
+            base64.b64decode(data, validate=True)
+        except binascii.Error:
+            raise ValueError("The `data` of the media is not valid base64.")
+
+        return ImglyController.UploadMediaInputDTO(
+            media_title=title, media_data=data, media_description=description
+        )
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown endpoint `{self.path}`."})
+            return
+
+        self._send_json(200, {"status": "ok"})
+
+    def do_POST(self) -> None:
+        if self.path != "/media":
+            self._send_json(404, {"error": f"Unknown endpoint `{self.path}`."})
+            return
+
+        try:
+            dto: ImglyController.UploadMediaInputDTO = self._read_upload_dto()
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        # wait for the batch containing the media to be committed
+        try:
+            self.server.batcher.submit(dto).result()
+        except DuplicateMediaError as e:
+            self._send_json(409, {"error": str(e)})
+            return
+        except UploadMediaError as e:
+            self._send_json(502, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(201, {"title": dto.media_title, "status": "uploaded"})
+
+
+class ImglyHTTPServer(ThreadingHTTPServer):
+    """HTTP server listening on a TCP address, the requests are handled concurrently and uploaded by the batcher."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], batcher: MediaBatcher) -> None:
+        super().__init__(address, ImglyRequestHandler)
+        self.batcher: MediaBatcher = batcher
+
+
+class ImglyUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix socket, the requests are handled concurrently and uploaded by the batcher."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, batcher: MediaBatcher) -> None:
+        """
+        Initializes the server, removing the socket left behind by a previous server that is no longer running.
+
+        Args:
+            socket_path: The path of the Unix socket.
+            batcher: The batcher used to upload the media received by the server.
+
+        Raises:
+            OSError: Something else than a stale socket exists at the path, or a server is still listening on it.
+        """
+        if os.path.lexists(socket_path):
+            _remove_stale_socket(socket_path)
+        super().__init__(socket_path, ImglyRequestHandler)
+        self.batcher: MediaBatcher = batcher
+        self._socket_inode: int = os.lstat(socket_path).st_ino
+
+    def server_close(self) -> None:
+        super().server_close()
+
+        # only remove the socket created by this server, another one may have replaced it since
+        try:
+            if os.lstat(self.server_address).st_ino == self._socket_inode:
+                os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Removes a Unix socket that no server listens on anymore.
+
+    Args:
+        socket_path: The path of the Unix socket.
+
+    Raises:
+        OSError: The path is not a socket, or a server is still listening on it.
+    """
+    if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+        raise OSError(f"`{socket_path}` already exists and is not a socket.")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+
+    raise OSError(f"A server is already listening on `{socket_path}`.")
+
+
+def _is_loopback(host: str) -> bool:
+    """Checks if a host only accepts connections from the local machine.
+
+    Args:
+        host: The host to check, a name or an IP address.
+
+    Returns:
+        Whether the host is a loopback address.
+    """
+    if host == "localhost":
+        return True
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_server(
+    batcher: MediaBatcher,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """
+    Creates the imgly server, listening on a Unix socket if a path is given, on a TCP address otherwise.
+    The server has no authentication and uploads with the token of the repository, so the TCP address must be a
+    loopback address.
+
+    Args:
+        batcher: The batcher used to upload the media received by the server.
+        host: The host of the TCP address.
+        port: The port of the TCP address.
+        socket_path: Optional path of the Unix socket.
+
+    Returns:
+        The server, ready to `serve_forever`.
+
+    Raises:
+        ValueError: The host is not a loopback address.
+        OSError: The Unix socket path is already used.
+    """
+    if socket_path:
+        return ImglyUnixServer(socket_path, batcher)
+
+    if not _is_loopback(host):
+        raise ValueError(
+            f"The host `{host}` is not a loopback address, the server must only be reachable from this machine."
+        )
+
+    return ImglyHTTPServer((host, port), batcher)
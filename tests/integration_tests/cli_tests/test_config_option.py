@@ -0,0 +1,57 @@
+import pytest
+from typer.testing import CliRunner
+
+from interfaces.cli import app
+from interfaces.cli import imgly_cli
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def no_controller(monkeypatch):
+    monkeypatch.setattr(imgly_cli, "controller", None)
+
+
+@pytest.fixture
+def bad_config(tmp_path):
+    config_path = tmp_path / "imgly.toml"
+    config_path.write_text('[github]\npath_layout = "bogus"\n')
+    return config_path
+
+
+def test_help_with_bad_config(bad_config, monkeypatch):
+    monkeypatch.setenv("IMGLY_CONFIG", str(bad_config))
+    result = runner.invoke(app, ["--help"])
+    assert result.exit_code == 0
+    assert "ingest" in result.stdout
+
+
+def test_bad_config(bad_config):
+    result = runner.invoke(
+        app, ["--config", str(bad_config), "upload-file", "img.png"]
+    )
+    assert result.exit_code == 1
+    assert "Error" in result.stdout
+    assert "bogus" in result.stdout
+
+
+def test_missing_token_file(tmp_path):
+    config_path = tmp_path / "imgly.toml"
+    config_path.write_text(f'[github]\ntoken_file = "{tmp_path / "missing"}"\n')
+    result = runner.invoke(
+        app, ["--config", str(config_path), "upload-file", "img.png"]
+    )
+    assert result.exit_code == 1
+    assert "Error" in result.stdout
+    assert "missing" in result.stdout
+
+
+def test_config_builds_controller(tmp_path):
+    config_path = tmp_path / "imgly.toml"
+    config_path.write_text('[github]\nowner = "owner"\nrepo = "repo"\n')
+    result = runner.invoke(
+        app, ["--config", str(config_path), "upload-file", "missing.png"]
+    )
+    # the command runs with the configured repository, and fails on the missing file
+    assert "does not exist" in result.stdout
+    assert imgly_cli.controller.repository.config.repo == "repo"
@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from imgly import ImglyController
+from interfaces.cli import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def test_data_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "test_data")
+
+
+@pytest.fixture
+def jsonl_manifest(tmp_path, test_data_dir):
+    manifest = tmp_path / "manifest.jsonl"
+    rows = [
+        {"path": os.path.join(test_data_dir, "img.png"), "description": "first"},
+        {"path": os.path.join(test_data_dir, "img123.png"), "title": "renamed.png"},
+        {"path": os.path.join(test_data_dir, "test_dir", "img1.png")},
+        # same title as the first row, skipped
+        {"path": os.path.join(test_data_dir, "img.png")},
+    ]
+    manifest.write_text("\n".join(json.dumps(row) for row in rows))
+    return manifest
+
+
+@pytest.fixture
+def invalid_manifest(tmp_path, test_data_dir):
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        "\n".join(
+            [
+                json.dumps({"path": os.path.join(test_data_dir, "img.png")}),
+                json.dumps({"path": os.path.join(test_data_dir, "img.HEIC")}),
+                json.dumps({"title": "no_path.png"}),
+                json.dumps(
+                    {
+                        "path": os.path.join(test_data_dir, "img123.png"),
+                        "title": "../img123.png",
+                    }
+                ),
+                json.dumps(
+                    {
+                        "path": os.path.join(test_data_dir, "img123.png"),
+                        "title": "index.json",
+                    }
+                ),
+                json.dumps(
+                    {
+                        "path": os.path.join(test_data_dir, "img123.png"),
+                        "title": "notes.txt",
+                    }
+                ),
+                json.dumps(
+                    {
+                        "path": os.path.join(test_data_dir, "img123.png"),
+                        "title": ".",
+                    }
+                ),
+                json.dumps(
+                    {
+                        "path": os.path.join(test_data_dir, "img123.png"),
+                        "description": 5,
+                    }
+                ),
+                "not json",
+            ]
+        )
+    )
+    return manifest
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_jsonl_manifest(mock_controller, jsonl_manifest):
+    mock_controller.find_existing_media.return_value = set()
+    mock_controller.UploadMediaInputDTO = ImglyController.UploadMediaInputDTO
+    result = runner.invoke(
+        app, ["ingest", str(jsonl_manifest), "--batch-size", "2"]
+    )
+    assert result.exit_code == 0, print(result.stdout)
+    assert mock_controller.upload_media_batch.call_count == 2
+
+    first_batch = mock_controller.upload_media_batch.call_args_list[0].args[0]
+    second_batch = mock_controller.upload_media_batch.call_args_list[1].args[0]
+    assert [dto.media_title for dto in first_batch] == ["img.png", "renamed.png"]
+    assert first_batch[0].media_description == "first"
+    assert [dto.media_title for dto in second_batch] == ["img1.png"]
+
+    assert "1 rows" in result.stdout
+    assert "successfully uploaded" in result.stdout
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_csv_manifest(mock_controller, tmp_path, test_data_dir):
+    mock_controller.find_existing_media.return_value = set()
+    mock_controller.UploadMediaInputDTO = ImglyController.UploadMediaInputDTO
+    manifest = tmp_path / "manifest.csv"
+    with open(manifest, "w", newline="") as manifest_file:
+        writer = csv.DictWriter(manifest_file, fieldnames=["path", "description"])
+        writer.writeheader()
+        writer.writerow({"path": os.path.join(test_data_dir, "img.png")})
+        writer.writerow(
+            {
+                "path": os.path.join(test_data_dir, "img123.png"),
+                "description": "second",
+            }
+        )
+
+    result = runner.invoke(app, ["ingest", str(manifest)])
+    assert result.exit_code == 0, print(result.stdout)
+    mock_controller.upload_media_batch.assert_called_once()
+
+    batch = mock_controller.upload_media_batch.call_args.args[0]
+    assert [dto.media_description for dto in batch] == [None, "second"]
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_invalid_manifest(mock_controller, invalid_manifest):
+    mock_controller.find_existing_media.return_value = set()
+    result = runner.invoke(app, ["ingest", str(invalid_manifest)])
+    assert result.exit_code == 1
+    assert "8 rows" in result.stdout
+    assert "path separators" in result.stdout
+    assert "`index.json` is not a supported image type" in result.stdout
+    assert "`notes.txt` is not a supported image type" in result.stdout
+    assert "`.` is not a supported image type" in result.stdout
+    assert "must be a string" in result.stdout
+    mock_controller.upload_media_batch.assert_not_called()
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_invalid_manifest_skip_invalid(mock_controller, invalid_manifest):
+    mock_controller.find_existing_media.return_value = set()
+    result = runner.invoke(app, ["ingest", str(invalid_manifest), "--skip-invalid"])
+    assert result.exit_code == 0, print(result.stdout)
+    assert "Warning" in result.stdout
+    mock_controller.upload_media_batch.assert_called_once()
+
+
+def test_ingest_manifest_not_found():
+    result = runner.invoke(app, ["ingest", "non_existent_manifest.jsonl"])
+    assert result.exit_code == 1
+    assert "does not exist" in result.stdout
+
+
+def test_ingest_manifest_bad_extension(test_data_dir):
+    result = runner.invoke(app, ["ingest", os.path.join(test_data_dir, "img.png")])
+    assert result.exit_code == 1
+    assert "not a supported format" in result.stdout
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_unreadable_file(mock_controller, jsonl_manifest):
+    mock_controller.find_existing_media.return_value = set()
+    with patch(
+        "pathlib.Path.read_bytes", side_effect=PermissionError("permission denied")
+    ):
+        result = runner.invoke(app, ["ingest", str(jsonl_manifest)])
+
+    # the output is wrapped to the width of the terminal
+    stdout = " ".join(result.stdout.split())
+    assert result.exit_code == 1
+    assert "Line 1" in stdout
+    assert "0 files were uploaded" in stdout
+    assert "permission denied" in stdout
+    mock_controller.upload_media_batch.assert_not_called()
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_existing_files(mock_controller, jsonl_manifest):
+    mock_controller.find_existing_media.return_value = {"img.png"}
+    result = runner.invoke(app, ["ingest", str(jsonl_manifest)])
+
+    assert result.exit_code == 1
+    assert "already exist" in result.stdout
+    assert "--skip-existing" in result.stdout
+    mock_controller.upload_media_batch.assert_not_called()
+
+
+@patch(
+    "interfaces.cli.imgly_cli.controller",
+)
+def test_ingest_skip_existing_files(mock_controller, jsonl_manifest):
+    mock_controller.UploadMediaInputDTO = ImglyController.UploadMediaInputDTO
+    mock_controller.find_existing_media.side_effect = lambda titles: {
+        "img.png",
+        "renamed.png",
+    } & set(titles)
+    result = runner.invoke(
+        app, ["ingest", str(jsonl_manifest), "--batch-size", "2", "--skip-existing"]
+    )
+
+    assert result.exit_code == 0, print(result.stdout)
+    # the first batch only had existing files, so only the second one is uploaded
+    mock_controller.upload_media_batch.assert_called_once()
+    batch = mock_controller.upload_media_batch.call_args.args[0]
+    assert [dto.media_title for dto in batch] == ["img1.png"]
+    assert "2 files already existed" in result.stdout
@@ -21,3 +21,24 @@ def test_upload_image_to_github():
     # Create the image file in the repository
     repository.save(media)
     repository.delete(media)
+
+
+def test_upload_image_batch_to_github():
+    repository = GitHubRepository()
+
+    # Read the image file and encode it in base64
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+    with open(
+        os.path.join(current_directory, "..", "test_data", "img.png"), "rb"
+    ) as image_file:
+        content = base64.b64encode(image_file.read()).decode("utf-8")
+
+    medias = [
+        Media(f"test_image_from_batch_test_{i}_{datetime.now()}.png", content)
+        for i in range(2)
+    ]
+
+    # Create the image files in the repository in a single commit
+    repository.save_batch(medias)
+    for media in medias:
+        repository.delete(media)
@@ -0,0 +1,116 @@
+from concurrent.futures import wait
+from unittest.mock import MagicMock
+
+import pytest
+
+from imgly import ImglyController
+from imgly.infra.github_infrastructure import DuplicateMediaError, UploadMediaError
+from interfaces.server import MediaBatcher
+
+
+def _dto(title):
+    return ImglyController.UploadMediaInputDTO(media_title=title, media_data="test")
+
+
+def test_batcher_coalesces_uploads():
+    controller = MagicMock()
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=0.2)
+    batcher.start()
+
+    futures = [batcher.submit(_dto(f"test{i}.png")) for i in range(3)]
+    wait(futures, timeout=5)
+    batcher.stop()
+
+    assert all(future.result() is None for future in futures)
+    controller.upload_media_batch.assert_called_once_with(
+        [_dto("test0.png"), _dto("test1.png"), _dto("test2.png")]
+    )
+
+
+def test_batcher_max_batch_size():
+    controller = MagicMock()
+    batcher = MediaBatcher(controller=controller, max_batch_size=2, max_delay=10)
+    batcher.start()
+
+    futures = [batcher.submit(_dto(f"test{i}.png")) for i in range(3)]
+    batcher.stop()
+
+    assert all(future.done() for future in futures)
+    assert [len(c.args[0]) for c in controller.upload_media_batch.call_args_list] == [
+        2,
+        1,
+    ]
+
+
+def test_batcher_carries_duplicate_titles():
+    controller = MagicMock()
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=10)
+    batcher.start()
+
+    futures = [batcher.submit(_dto("test.png")) for _ in range(2)]
+    batcher.stop()
+
+    assert all(future.done() for future in futures)
+    assert controller.upload_media_batch.call_count == 2
+
+
+def test_batcher_duplicate_fails_only_its_upload():
+    def upload_media_batch(dtos):
+        if any(dto.media_title == "duplicate.png" for dto in dtos):
+            raise DuplicateMediaError("duplicate", ["duplicate.png"])
+
+    controller = MagicMock()
+    controller.upload_media_batch.side_effect = upload_media_batch
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=10)
+    batcher.start()
+
+    futures = [batcher.submit(_dto(f"test{i}.png")) for i in range(2)]
+    duplicate = batcher.submit(_dto("duplicate.png"))
+    batcher.stop()
+
+    assert all(future.result() is None for future in futures)
+    with pytest.raises(DuplicateMediaError):
+        duplicate.result()
+
+    # the rest of the batch is uploaded again as a single batch
+    assert controller.upload_media_batch.call_count == 2
+    assert controller.upload_media_batch.call_args.args[0] == [
+        _dto("test0.png"),
+        _dto("test1.png"),
+    ]
+    controller.upload_media.assert_not_called()
+
+
+def test_batcher_unknown_duplicate_uploads_one_by_one():
+    def upload_media(dto):
+        if dto.media_title == "duplicate.png":
+            raise DuplicateMediaError("duplicate")
+
+    controller = MagicMock()
+    controller.upload_media_batch.side_effect = DuplicateMediaError("duplicate")
+    controller.upload_media.side_effect = upload_media
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=10)
+    batcher.start()
+
+    new = batcher.submit(_dto("new.png"))
+    duplicate = batcher.submit(_dto("duplicate.png"))
+    batcher.stop()
+
+    assert new.result() is None
+    with pytest.raises(DuplicateMediaError):
+        duplicate.result()
+
+
+def test_batcher_upload_error_fails_batch():
+    controller = MagicMock()
+    controller.upload_media_batch.side_effect = UploadMediaError("failed")
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=10)
+    batcher.start()
+
+    futures = [batcher.submit(_dto(f"test{i}.png")) for i in range(2)]
+    batcher.stop()
+
+    for future in futures:
+        with pytest.raises(UploadMediaError):
+            future.result()
+    controller.upload_media.assert_not_called()
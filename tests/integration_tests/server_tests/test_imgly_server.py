@@ -0,0 +1,183 @@
+import http.client
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from imgly.infra.github_infrastructure import DuplicateMediaError
+from interfaces.server import MediaBatcher, create_server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.fixture
+def controller():
+    return MagicMock()
+
+
+def _run_server(controller, **kwargs):
+    batcher = MediaBatcher(controller=controller, max_batch_size=10, max_delay=0.5)
+    server = create_server(batcher, **kwargs)
+    batcher.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, batcher
+
+
+@pytest.fixture
+def http_server(controller):
+    server, batcher = _run_server(controller, host="127.0.0.1", port=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+    batcher.stop()
+
+
+def _post_media(connection, body):
+    connection.request(
+        "POST",
+        "/media",
+        body=json.dumps(body),
+        headers={"Content-Type": "application/json"},
+    )
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def _connect(server):
+    return http.client.HTTPConnection(*server.server_address)
+
+
+def test_health(http_server):
+    connection = _connect(http_server)
+    connection.request("GET", "/health")
+    assert connection.getresponse().status == 200
+
+
+def test_upload_media_requests_are_batched(controller, http_server):
+    def upload(i):
+        return _post_media(
+            _connect(http_server), {"title": f"test{i}.png", "data": "test"}
+        )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(upload, range(3)))
+
+    assert [status for status, _ in results] == [201, 201, 201]
+    controller.upload_media_batch.assert_called_once()
+    titles = {dto.media_title for dto in controller.upload_media_batch.call_args.args[0]}
+    assert titles == {"test0.png", "test1.png", "test2.png"}
+
+
+def test_upload_media_invalid_base64_does_not_fail_batch(controller, http_server):
+    bodies = [
+        {"title": "test0.png", "data": "test"},
+        {"title": "test1.png", "data": "not base64!"},
+        {"title": "test2.png", "data": "test"},
+    ]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(
+            executor.map(lambda body: _post_media(_connect(http_server), body), bodies)
+        )
+
+    assert [status for status, _ in results] == [201, 400, 201]
+    assert "base64" in results[1][1]["error"]
+    controller.upload_media_batch.assert_called_once()
+    titles = {dto.media_title for dto in controller.upload_media_batch.call_args.args[0]}
+    assert titles == {"test0.png", "test2.png"}
+
+
+def test_upload_media_bad_request(controller, http_server):
+    status, body = _post_media(_connect(http_server), {"title": "test.png"})
+    assert status == 400
+    assert "data" in body["error"]
+
+    status, body = _post_media(
+        _connect(http_server), {"title": "test.xyz", "data": "test"}
+    )
+    assert status == 400
+    assert "not a supported image type" in body["error"]
+    controller.upload_media_batch.assert_not_called()
+
+
+def test_upload_media_duplicate(controller, http_server):
+    controller.upload_media_batch.side_effect = DuplicateMediaError("duplicate")
+    status, body = _post_media(
+        _connect(http_server), {"title": "test.png", "data": "test"}
+    )
+    assert status == 409
+    assert "duplicate" in body["error"]
+
+
+def test_upload_media_unix_socket(controller, tmp_path):
+    socket_path = str(tmp_path / "imgly.sock")
+    server, batcher = _run_server(controller, socket_path=socket_path)
+
+    status, _ = _post_media(
+        UnixHTTPConnection(socket_path), {"title": "test.png", "data": "test"}
+    )
+
+    server.shutdown()
+    server.server_close()
+    batcher.stop()
+
+    assert status == 201
+    controller.upload_media_batch.assert_called_once()
+
+
+@pytest.mark.parametrize("title", ["a/b.png", "../x.png", "a\\b.png"])
+def test_upload_media_path_in_title(controller, http_server, title):
+    status, body = _post_media(_connect(http_server), {"title": title, "data": "test"})
+    assert status == 400
+    assert "path separators" in body["error"]
+    controller.upload_media_batch.assert_not_called()
+
+
+def test_create_server_non_loopback_host(controller):
+    batcher = MediaBatcher(controller=controller)
+    with pytest.raises(ValueError, match="loopback"):
+        create_server(batcher, host="0.0.0.0", port=0)
+
+
+def test_unix_socket_path_is_a_file(controller, tmp_path):
+    file_path = tmp_path / "precious.txt"
+    file_path.write_text("precious")
+
+    with pytest.raises(OSError, match="not a socket"):
+        create_server(MediaBatcher(controller=controller), socket_path=str(file_path))
+    assert file_path.read_text() == "precious"
+
+
+def test_unix_socket_already_served(controller, tmp_path):
+    socket_path = str(tmp_path / "imgly.sock")
+    server, batcher = _run_server(controller, socket_path=socket_path)
+
+    with pytest.raises(OSError, match="already listening"):
+        create_server(MediaBatcher(controller=controller), socket_path=socket_path)
+
+    server.shutdown()
+    server.server_close()
+    batcher.stop()
+
+
+def test_unix_socket_stale(controller, tmp_path):
+    socket_path = str(tmp_path / "imgly.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    server = create_server(MediaBatcher(controller=controller), socket_path=socket_path)
+    server.server_close()
+    assert not os.path.exists(socket_path)
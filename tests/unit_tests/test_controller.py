@@ -18,3 +18,39 @@ def test_upload_media():
     repository.save.assert_called_with(
         Media(title="test.jpg", data="test", description="test_description")
     )
+
+
+def test_upload_media_batch():
+    repository = MagicMock(spec=Repository)
+    controller = ImglyController(repository=repository)
+    dtos = [
+        ImglyController.UploadMediaInputDTO(
+            media_title="test1.jpg", media_data="test1"
+        ),
+        ImglyController.UploadMediaInputDTO(
+            media_title="test2.jpg",
+            media_data="test2",
+            media_description="test_description",
+        ),
+    ]
+
+    controller.upload_media_batch(dtos)
+
+    repository.save_batch.assert_called_once()
+    repository.save_batch.assert_called_with(
+        [
+            Media(title="test1.jpg", data="test1"),
+            Media(title="test2.jpg", data="test2", description="test_description"),
+        ]
+    )
+
+
+def test_find_existing_media():
+    repository = MagicMock(spec=Repository)
+    repository.find_existing.return_value = {"test1.jpg"}
+    controller = ImglyController(repository=repository)
+
+    existing = controller.find_existing_media(["test1.jpg", "test2.jpg"])
+
+    repository.find_existing.assert_called_once_with(["test1.jpg", "test2.jpg"])
+    assert existing == {"test1.jpg"}
@@ -0,0 +1,81 @@
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from imgly.infra.github_infrastructure import ConfigError, GitHubConfig
+
+
+def test_load_default_config(tmp_path, monkeypatch):
+    monkeypatch.delenv("IMGLY_CONFIG", raising=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        "imgly.infra.github_infrastructure.config.DEFAULT_CONFIG_PATHS",
+        [tmp_path / "imgly.toml"],
+    )
+
+    assert GitHubConfig.load() == GitHubConfig()
+
+
+def test_load_config_file(tmp_path, monkeypatch):
+    config_path = tmp_path / "imgly.toml"
+    config_path.write_text(
+        "[github]\n"
+        'owner = "owner"\n'
+        'repo = "repo"\n'
+        'branch = "dev"\n'
+        'path_layout = "date-nested"\n'
+    )
+    monkeypatch.setenv("IMGLY_CONFIG", str(config_path))
+
+    config = GitHubConfig.load()
+
+    assert config.owner == "owner"
+    assert config.repo == "repo"
+    assert config.branch == "dev"
+    assert config.media_folder == GitHubConfig.media_folder
+    assert config.get_shard("test.png", datetime(2024, 12, 8)) == "2024/12/08"
+
+
+def test_load_config_file_not_found(tmp_path):
+    with pytest.raises(ConfigError):
+        GitHubConfig.load(tmp_path / "missing.toml")
+
+
+def test_load_config_file_unknown_key(tmp_path):
+    config_path = tmp_path / "imgly.toml"
+    config_path.write_text('[github]\nrepository = "repo"\n')
+
+    with pytest.raises(ConfigError, match="repository"):
+        GitHubConfig.load(config_path)
+
+
+def test_invalid_path_layout():
+    with pytest.raises(ConfigError):
+        GitHubConfig(path_layout="date_nested")
+    with pytest.raises(ConfigError):
+        GitHubConfig(path_layout="{week}")
+
+
+def test_shard_layouts():
+    date = datetime(2024, 12, 8)
+    digest = hashlib.sha256("test.png".encode("utf-8")).hexdigest()
+
+    assert GitHubConfig().get_shard("test.png", date) == "2024-12-08"
+    assert (
+        GitHubConfig(path_layout="hash-prefix").get_shard("test.png", date)
+        == f"{digest[:2]}/{digest[:4]}"
+    )
+    assert (
+        GitHubConfig(path_layout="{year}/{hash:.2}").get_shard("test.png", date)
+        == f"2024/{digest[:2]}"
+    )
+
+
+def test_token_sources(tmp_path, monkeypatch):
+    monkeypatch.setenv("IMGLY_TEST_TOKEN", "env_token")
+    assert GitHubConfig(token_env="IMGLY_TEST_TOKEN").get_token() == "env_token"
+
+    token_path = tmp_path / "token"
+    token_path.write_text("file_token\n")
+    assert GitHubConfig(token_file=str(token_path)).get_token() == "file_token"
@@ -0,0 +1,361 @@
+import itertools
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from imgly.application.entities import Media
+from imgly.infra.github_infrastructure import (
+    DeleteMediaError,
+    DuplicateMediaError,
+    GitHubConfig,
+    GitHubRepository,
+    UploadMediaError,
+)
+
+SHARD = "medias/shard"
+API_URL = "https://api.github.com/repos/owner/repo"
+
+
+def _response(status_code=200, body=None):
+    response = MagicMock(status_code=status_code, text=json.dumps(body))
+    response.json.return_value = body
+    response.content = json.dumps(body).encode("utf-8")
+    return response
+
+
+class FakeGitHub:
+    """In-memory GitHub repository answering the requests of the mocked session."""
+
+    def __init__(self):
+        self.ids = itertools.count()
+        self.blobs = {}
+        self.commits = {"c0": ({}, None)}
+        self.head = "c0"
+        self.patches = 0
+        self.before_patch = None
+
+    def files(self, ref="main"):
+        return self.commits[self.head if ref == "main" else ref][0]
+
+    def commit_files(self, changes):
+        """Commits files directly on the branch, like another process would."""
+        files = dict(self.files())
+        files.update(changes)
+        sha = f"c{next(self.ids)}x"
+        self.commits[sha] = (files, self.head)
+        self.head = sha
+
+    def get(self, url, params=None, headers=None):
+        path = url.removeprefix(f"{API_URL}/")
+        if path.startswith("contents/"):
+            files = self.files(params["ref"])
+            file_path = path.removeprefix("contents/")
+            if file_path not in files:
+                return _response(404, {"message": "Not Found"})
+            return _response(200, json.loads(files[file_path]))
+
+        ref, shard = path.removeprefix("git/trees/").split(":", 1)
+        names = [
+            name.removeprefix(f"{shard}/")
+            for name in self.files(ref)
+            if name.startswith(f"{shard}/")
+        ]
+        if not names:
+            return _response(404, {"message": "Not Found"})
+        return _response(
+            200, {"tree": [{"path": name, "type": "blob"} for name in names]}
+        )
+
+    def request(self, method, url, data=None):
+        endpoint = url.removeprefix(f"{API_URL}/git/")
+        payload = json.loads(data) if data else None
+
+        if method == "GET" and endpoint.startswith("ref/heads/"):
+            return _response(200, {"object": {"sha": self.head}})
+        if method == "GET" and endpoint.startswith("commits/"):
+            return _response(200, {"tree": {"sha": endpoint.removeprefix("commits/")}})
+        if endpoint == "blobs":
+            sha = f"b{next(self.ids)}"
+            self.blobs[sha] = json.dumps(payload["content"])
+            return _response(201, {"sha": sha})
+        if endpoint == "trees":
+            files = dict(self.commits[payload["base_tree"]][0])
+            for entry in payload["tree"]:
+                if "content" in entry:
+                    files[entry["path"]] = json.dumps(json.loads(entry["content"]))
+                elif entry["sha"] is None:
+                    files.pop(entry["path"], None)
+                else:
+                    files[entry["path"]] = self.blobs[entry["sha"]]
+            sha = f"t{next(self.ids)}"
+            self.commits[sha] = (files, None)
+            return _response(201, {"sha": sha})
+        if endpoint == "commits":
+            sha = f"c{next(self.ids)}"
+            files = self.commits[payload["tree"]][0]
+            self.commits[sha] = (files, payload["parents"][0])
+            return _response(201, {"sha": sha})
+        if method == "PATCH":
+            self.patches += 1
+            if self.before_patch:
+                self.before_patch()
+            if self.commits[payload["sha"]][1] != self.head:
+                return _response(422, {"message": "Update is not a fast forward"})
+            self.head = payload["sha"]
+            return _response(200, {"object": {"sha": self.head}})
+
+        raise AssertionError(f"Unexpected request {method} {url}")
+
+
+@pytest.fixture
+def github():
+    return FakeGitHub()
+
+
+@pytest.fixture
+def repository(github):
+    repository = GitHubRepository(
+        GitHubConfig(owner="owner", repo="repo", media_folder="medias")
+    )
+    repository.session = MagicMock()
+    repository.session.get.side_effect = github.get
+    repository.session.request.side_effect = github.request
+    return repository
+
+
+def _index(github, shard):
+    return json.loads(github.files()[f"{shard}/index.json"])
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 500])
+def test_read_index_error_is_not_cached(repository, status_code):
+    repository.session.get.side_effect = None
+    repository.session.get.return_value = _response(status_code, {"message": "error"})
+
+    with pytest.raises(UploadMediaError):
+        repository._read_index(SHARD)
+    assert SHARD not in repository._shard_index
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 500])
+def test_read_index_listing_error_is_not_cached(repository, status_code):
+    repository.session.get.side_effect = [
+        _response(404, {"message": "Not Found"}),
+        _response(status_code, {"message": "error"}),
+    ]
+
+    with pytest.raises(UploadMediaError):
+        repository._read_index(SHARD)
+    assert SHARD not in repository._shard_index
+
+
+def test_read_index_truncated_listing(repository):
+    repository.session.get.side_effect = [
+        _response(404, {"message": "Not Found"}),
+        _response(200, {"tree": [], "truncated": True}),
+    ]
+
+    with pytest.raises(UploadMediaError, match="truncated"):
+        repository._read_index(SHARD)
+    assert SHARD not in repository._shard_index
+
+
+def test_save_batch_rebuilds_commit_when_branch_moves(repository, github):
+    shard = repository._get_shard("new.png")
+
+    # another process commits in the same shard while the batch is being committed
+    def commit_other():
+        github.before_patch = None
+        github.commit_files(
+            {
+                f"{shard}/other.png": json.dumps("OTHER"),
+                f"{shard}/index.json": json.dumps(["other.png"]),
+            }
+        )
+
+    github.before_patch = commit_other
+    repository.save_batch([Media("new.png", "NEW")])
+
+    assert github.patches == 2
+    assert _index(github, shard) == ["new.png", "other.png"]
+    assert json.loads(github.files()[f"{shard}/other.png"]) == "OTHER"
+    assert json.loads(github.files()[f"{shard}/new.png"]) == "NEW"
+
+
+def test_save_batch_ignores_stale_cache(repository, github):
+    shard = repository._get_shard("new.png")
+
+    # the cached index is empty, then another process commits the same media
+    assert repository.find_existing(["new.png"]) == set()
+    github.commit_files(
+        {
+            f"{shard}/new.png": json.dumps("OTHER"),
+            f"{shard}/index.json": json.dumps(["new.png"]),
+        }
+    )
+
+    with pytest.raises(DuplicateMediaError):
+        repository.save_batch([Media("new.png", "NEW")])
+    assert json.loads(github.files()[f"{shard}/new.png"]) == "OTHER"
+
+
+def test_save_batch_reuses_indexes_of_last_commit(repository, github):
+    repository.save_batch([Media("a.png", "A")])
+    repository.session.get.reset_mock()
+
+    repository.save_batch([Media("b.png", "B")])
+
+    # the parent is the previous commit, its index is known without reading it
+    repository.session.get.assert_not_called()
+    assert _index(github, repository._get_shard("a.png")) == ["a.png", "b.png"]
+
+
+def test_save_batch_reads_indexes_after_other_commit(repository, github):
+    shard = repository._get_shard("a.png")
+    repository.save_batch([Media("a.png", "A")])
+    github.commit_files(
+        {
+            f"{shard}/b.png": json.dumps("OTHER"),
+            f"{shard}/index.json": json.dumps(["a.png", "b.png"]),
+        }
+    )
+
+    with pytest.raises(DuplicateMediaError):
+        repository.save_batch([Media("b.png", "B")])
+    assert json.loads(github.files()[f"{shard}/b.png"]) == "OTHER"
+
+
+def test_commit_gives_up_when_branch_keeps_moving(repository, github):
+    github.before_patch = lambda: github.commit_files({"other.txt": json.dumps("")})
+
+    with pytest.raises(UploadMediaError, match="kept moving"):
+        repository.save_batch([Media("new.png", "NEW")])
+    assert github.patches == GitHubRepository.max_commit_attempts
+
+
+def test_read_index_from_index_file(repository, github):
+    github.commit_files({f"{SHARD}/index.json": json.dumps(["a.png", "b.png"])})
+
+    assert repository._read_index(SHARD) == {"a.png", "b.png"}
+    assert repository._shard_index[SHARD][1] == {"a.png", "b.png"}
+
+    # the cached index is used until it expires
+    github.commit_files({f"{SHARD}/index.json": json.dumps(["c.png"])})
+    assert repository._read_index(SHARD) == {"a.png", "b.png"}
+    assert repository._read_index(SHARD, github.head) == {"c.png"}
+
+
+def test_read_index_falls_back_to_listing(repository, github):
+    github.commit_files(
+        {f"{SHARD}/a.png": json.dumps("A"), f"{SHARD}/b.png": json.dumps("B")}
+    )
+
+    assert repository._read_index(SHARD) == {"a.png", "b.png"}
+
+
+def test_read_index_missing_shard(repository):
+    assert repository._read_index(SHARD) == set()
+
+
+def test_get_index_entry():
+    entry = GitHubRepository._get_index_entry(SHARD, {"b.png", "a.png"})
+
+    assert entry["path"] == f"{SHARD}/index.json"
+    assert entry["mode"] == "100644"
+    assert entry["type"] == "blob"
+    assert json.loads(entry["content"]) == ["a.png", "b.png"]
+
+
+def test_commit(repository, github):
+    parents = []
+
+    def build_entries(head_sha):
+        parents.append(head_sha)
+        return [{"path": "a.txt", "mode": "100644", "type": "blob", "content": "1"}]
+
+    repository._commit(build_entries, "message")
+
+    assert parents == ["c0"]
+    assert github.files()["a.txt"] == "1"
+    assert github.commits[github.head][1] == "c0"
+
+
+def test_commit_request_error(repository, github):
+    repository.session.request.side_effect = lambda method, url, data=None: (
+        _response(500, {"message": "error"})
+    )
+
+    with pytest.raises(DeleteMediaError):
+        repository._commit(
+            lambda head_sha: [], "message", error=DeleteMediaError
+        )
+
+
+def test_save_batch(repository, github):
+    repository.save_batch([Media("a.png", "A", "first"), Media("b.png", "B")])
+
+    shard = repository._get_shard("a.png")
+    assert _index(github, shard) == ["a.png", "b.png"]
+    assert json.loads(github.files()[f"{shard}/a.png"]) == "A"
+    assert repository.find_existing(["a.png", "c.png"]) == {"a.png"}
+
+
+@pytest.mark.parametrize(
+    "title", ["index.json", "../a.png", "a/b.png", "a\\b.png", "a..png"]
+)
+def test_save_batch_invalid_title(repository, title):
+    with pytest.raises(UploadMediaError):
+        repository.save_batch([Media("a.png", "A"), Media(title, "B")])
+
+    # nothing is requested before the titles are checked
+    repository.session.get.assert_not_called()
+    repository.session.request.assert_not_called()
+
+
+def test_save_batch_duplicates_across_shards(repository, github):
+    repository.config = GitHubConfig(
+        owner="owner", repo="repo", media_folder="medias", path_layout="hash-prefix"
+    )
+    titles = ["a.png", "b.png", "c.png"]
+    assert len({repository._get_shard(title) for title in titles}) == 3
+
+    repository.save_batch([Media("b.png", "B")])
+    blobs = len(github.blobs)
+
+    with pytest.raises(DuplicateMediaError) as error:
+        repository.save_batch([Media(title, title) for title in titles])
+
+    assert error.value.titles == {"b.png"}
+    # nothing is uploaded when a duplicate is found
+    assert len(github.blobs) == blobs
+    assert repository.find_existing(titles) == {"b.png"}
+
+
+def test_delete(repository, github):
+    repository.save_batch([Media("a.png", "A"), Media("b.png", "B")])
+    shard = repository._get_shard("a.png")
+
+    repository.delete(Media("a.png", "A"))
+
+    assert f"{shard}/a.png" not in github.files()
+    assert _index(github, shard) == ["b.png"]
+    assert repository.find_existing(["a.png", "b.png"]) == {"b.png"}
+
+
+def test_delete_missing_media(repository):
+    with pytest.raises(DeleteMediaError, match="does not exist"):
+        repository.delete(Media("a.png", "A"))
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 500])
+def test_delete_request_error(repository, status_code):
+    repository.session.get.side_effect = None
+    repository.session.get.return_value = _response(
+        status_code, {"message": "Bad credentials"}
+    )
+
+    with pytest.raises(DeleteMediaError, match="Bad credentials") as error:
+        repository.delete(Media("a.png", "A"))
+    assert "does not exist" not in str(error.value)
+    repository.session.request.assert_not_called()
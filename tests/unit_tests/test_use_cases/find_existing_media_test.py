@@ -0,0 +1,18 @@
+from unittest.mock import MagicMock
+
+from imgly.application.use_cases import FindExistingMediaUseCase
+
+
+def test_find_existing_media_use_case():
+    repository = MagicMock()
+    repository.find_existing.return_value = {"test1.jpg"}
+    use_case = FindExistingMediaUseCase(repository=repository)
+
+    input_dto = FindExistingMediaUseCase.FindExistingMediaInputDTO(
+        media_titles=("test1.jpg", "test2.jpg")
+    )
+
+    output_dto = use_case.execute(input_dto)
+
+    repository.find_existing.assert_called_once_with(["test1.jpg", "test2.jpg"])
+    assert output_dto.existing_titles == frozenset({"test1.jpg"})
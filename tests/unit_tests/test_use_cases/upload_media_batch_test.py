@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from imgly.application.entities import Media
+from imgly.application.use_cases import UploadMediaBatchUseCase, UploadMediaUseCase
+
+
+def test_media_upload_batch_use_case():
+    repository = MagicMock()
+    use_case = UploadMediaBatchUseCase(repository=repository)
+
+    input_dto = UploadMediaBatchUseCase.UploadMediaBatchInputDTO(
+        medias=(
+            UploadMediaUseCase.UploadMediaInputDTO(
+                media_title="test1.jpg", media_data="test1"
+            ),
+            UploadMediaUseCase.UploadMediaInputDTO(
+                media_title="test2.jpg",
+                media_data="test2",
+                media_description="description",
+            ),
+        )
+    )
+
+    use_case.execute(input_dto)
+
+    repository.save_batch.assert_called_once()
+    repository.save_batch.assert_called_with(
+        [
+            Media(title="test1.jpg", data="test1"),
+            Media(title="test2.jpg", data="test2", description="description"),
+        ]
+    )